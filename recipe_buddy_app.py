@@ -1,12 +1,46 @@
 # EatSmart (Local, CPU-Friendly)
 # Streamlit app that uses a local open-source LLM via Ollama (optional) to suggest recipes
 
+from __future__ import annotations
+
+import copy
+import hashlib
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional
-import requests
+import re
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 import streamlit as st
 
+if TYPE_CHECKING:
+    import requests
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module is used instead
+    orjson = None
+
+try:
+    import json_repair
+except ImportError:  # optional; malformed model output then falls back to the raw view
+    json_repair = None
+
+logger = logging.getLogger("recipe_buddy")
+if not logger.handlers:  # the script reruns, but the logger is process-wide
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+    _level = os.environ.get("RB_LOG", "WARNING").upper()
+    # getLevelName maps known names to their number; an unknown RB_LOG falls back to WARNING
+    logger.setLevel(_level if isinstance(logging.getLevelName(_level), int) else logging.WARNING)
+
 st.set_page_config(page_title="EatSmart", page_icon="🍳", layout="centered")
 
 custom_css = '''
@@ -14,7 +48,9 @@ custom_css = '''
 body, .stApp {
     background-color: #1c1d1f !important;
 }
-.stApp, .stMarkdown, .stText, .stHeader, .stSubheader, .stTitle, .stCaption, .stDataFrame, .stAlert, .stTextInput, .stTextArea, .stSelectbox, .stMultiSelect, .stRadio, .stButton, .stCheckbox, .stSlider, .stNumberInput, .stDateInput, .stTimeInput, .stFileUploader, .stColorPicker, .stForm, .stFormSubmitButton, .stExpander, .stTabs, .stTab, .stMetric, .stJson, .stCode, .stException, .stError, .stWarning, .stSuccess, .stInfo, .stHelp, .stTooltip, .stProgress, .stSpinner, .stSidebar, .stSidebarContent, .stSidebarHeader, .stSidebarSubheader, .stSidebarTitle, .stSidebarCaption, .stSidebarDataFrame, .stSidebarAlert, .stSidebarTextInput, .stSidebarTextArea, .stSidebarSelectbox, .stSidebarMultiSelect, .stSidebarRadio, .stSidebarButton, .stSidebarCheckbox, .stSidebarSlider, .stSidebarNumberInput, .stSidebarDateInput, .stSidebarTimeInput, .stSidebarFileUploader, .stSidebarColorPicker, .stSidebarForm, .stSidebarFormSubmitButton, .stSidebarExpander, .stSidebarTabs, .stSidebarTab, .stSidebarMetric, .stSidebarJson, .stSidebarCode, .stSidebarException, .stSidebarError, .stSidebarWarning, .stSidebarSuccess, .stSidebarInfo, .stSidebarHelp, .stSidebarTooltip, .stSidebarProgress, .stSidebarSpinner {
+.stApp, .stMarkdown, .stText, .stHeader, .stSubheader, .stTitle, .stCaption, .stDataFrame, .stAlert, .stTextInput, .stTextArea, .stSelectbox,
+.stMultiSelect, .stRadio, .stButton, .stCheckbox, .stSlider, .stNumberInput, .stDateInput, .stTimeInput, .stFileUploader, .stColorPicker, .stForm, .stFormSubmitButton,
+.stExpander, .stTabs, .stTab, .stMetric, .stJson, .stCode, .stException, .stError, .stWarning, .stSuccess, .stInfo, .stHelp, .stTooltip, .stProgress, .stSpinner {
     color: #D35400 !important;
 }
 /* Input fields text and border color */
@@ -36,8 +72,6 @@ input:focus, textarea:focus, select:focus {
     outline: 2px solid #1c1d1f !important;
     box-shadow: 0 0 0 2px #1c1d1f33 !important;
 }
-</style>
-<style>
 /* Custom color for radio button options */
 .stRadio label, .stRadio div[data-baseweb="radio"] label, .stRadio span, .stRadio div[role="radio"] span {
     color: #d35400 !important;
@@ -49,104 +83,584 @@ st.markdown(custom_css, unsafe_allow_html=True)
 
 APP_TITLE = "EatSmart"
 DATA_DIR = ".recipe_buddy_data"
-USERS_FILE = os.path.join(DATA_DIR, "users.json")
+USERS_FILE = os.path.join(DATA_DIR, "users.json")  # legacy store, imported into USERS_DB once
+USERS_DB = os.path.join(DATA_DIR, "users.db")
+RECIPE_COUNT = 4
+OLLAMA_KEEP_ALIVE = "30m"  # keep the model loaded between form submissions
+# Sampling limits for every generation; the prompt plus one compact recipe fits in 1024 tokens
+OLLAMA_OPTIONS = {"num_ctx": 1024, "top_k": 20, "top_p": 0.9, "repeat_penalty": 1.05}
+RECIPE_MAX_TOKENS = 400  # output cap for a single-recipe generation
+# Explicit Q4_K_M tags, in order of preference; later ones are smaller and used if earlier ones can't be pulled
+OLLAMA_MODELS = ("gemma3:1b-it-q4_K_M", "qwen2.5:0.5b-instruct-q4_K_M")
+MEAL_OPTIONS = ("Choose an option", "Breakfast", "Lunch", "Dinner", "Snack")
+MOOD_OPTIONS = ("Comforting", "Spicy", "Creamy", "Light", "Tangy", "Savory", "Sweet", "Fresh", "Hearty", "Zesty")
+CONSTRAINT_OPTIONS = ("High-protein", "Low-calorie", "Vegan", "Vegetarian", "Gluten-free", "Dairy-free", "Nut-free", "Low-carb")
 
 # ---------- Utilities ----------
+def json_loads(data: Any) -> Any:
+    """
+    Parses JSON from str or bytes, using orjson when it is installed.
+    Parse failures raise json.JSONDecodeError either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serializes to compact UTF-8 JSON bytes, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 def ensure_data_dir():
     if not os.path.isdir(DATA_DIR):
         os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.isfile(USERS_FILE):
-        with open(USERS_FILE, "w") as f:
-            json.dump({}, f)
 
-def load_users() -> Dict[str, Any]:
-    ensure_data_dir()
-    with open(USERS_FILE, "r") as f:
+def new_user() -> Dict[str, Any]:
+    return {
+        "pantry": [],
+        "profile": {"diet": [], "allergies": []},
+        "history": []
+    }
+
+def normalize_pantry(items: Any) -> List[str]:
+    """
+    Strips, lowercases, dedupes and sorts pantry items, given as a list or a comma-separated string.
+    """
+    if isinstance(items, str):
+        items = items.split(",")
+    return sorted({item.strip().lower() for item in items if item.strip()})
+
+class UserStore:
+    """
+    Per-user profiles in SQLite, one JSON blob per row, so reading or saving a profile
+    touches only that user's row instead of the whole user base. WAL mode lets sessions
+    read while another one writes. Imports the legacy users.json on first use.
+    Saving a profile identical to the stored one is skipped.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._digests: Dict[str, bytes] = {}  # username -> digest of the blob last read or written
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, blob BLOB NOT NULL)")
+            if self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None:
+                self._import_json(USERS_FILE)
+
+    def _import_json(self, path: str):
+        if not os.path.isfile(path):
+            return
+        with open(path, "rb") as f:
+            data = f.read()
         try:
-            return json.load(f)
+            users = json_loads(data) if data else {}
         except json.JSONDecodeError:
-            return {}
+            logger.warning("Skipping import of unreadable %s", path)
+            return
+        for user in users.values():
+            # Older versions saved pantries as typed; everything saved since is normalized
+            user["pantry"] = normalize_pantry(user.get("pantry") or [])
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO users (username, blob) VALUES (?, ?)",
+            [(name, json_dumps(user)) for name, user in users.items()]
+        )
+        self._conn.execute("COMMIT")
+        logger.info("Imported %d users from %s", len(users), path)
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT blob FROM users WHERE username = ?", (username,)).fetchone()
+            if row:
+                self._digests[username] = self._digest(row[0])
+        return json_loads(row[0]) if row else None
 
-def save_users(users: Dict[str, Any]):
+    def put(self, username: str, user: Dict[str, Any]):
+        blob = json_dumps(user)
+        digest = self._digest(blob)
+        with self._lock:
+            if self._digests.get(username) == digest:
+                return
+            self._conn.execute("INSERT OR REPLACE INTO users (username, blob) VALUES (?, ?)", (username, blob))
+            self._digests[username] = digest
+
+    @staticmethod
+    def _digest(blob: Any) -> bytes:
+        if isinstance(blob, str):
+            blob = blob.encode()
+        return hashlib.blake2b(blob, digest_size=8).digest()
+
+@st.cache_resource
+def _user_store() -> UserStore:
     ensure_data_dir()
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=2)
-
-def get_user(users: Dict[str, Any], username: str) -> Dict[str, Any]:
-    if username not in users:
-        users[username] = {
-            "pantry": [],
-            "profile": {"diet": [], "allergies": []},
-            "history": []
-        }
-    return users[username]
+    return UserStore(USERS_DB)
+
+class TTLCache:
+    """
+    Small thread-safe LRU mapping whose entries expire after ttl seconds.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __contains__(self, key: Any) -> bool:
+        # Unlike get, doesn't count as a use or drop the expired entry
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[0] > time.monotonic()
+
+class RecipeCache:
+    """
+    Two-tier cache of generated recipes. Exact hits match the canonicalized request.
+    Near hits reuse an entry whose hard requirements (backend, model, meal, constraints,
+    must-use ingredients) are identical, whose time limit fits, and whose pantry and mood
+    overlap the request's by at least `similarity` (Jaccard).
+    """
+    def __init__(self, max_entries: int, ttl: float, similarity: float = 0.9, max_per_group: int = 32):
+        self.similarity = similarity
+        self.max_per_group = max_per_group
+        self._entries = TTLCache(max_entries, ttl)
+        self._groups: Dict[tuple, List[tuple]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(request: tuple) -> str:
+        strict, soft, time_limit = request
+        return hashlib.blake2b(json_dumps([strict, sorted(soft), time_limit]), digest_size=16).hexdigest()
+
+    def get(self, request: tuple, near: bool = True) -> Any:
+        hit = self._entries.get(self._key(request))
+        if hit is not None or not near:
+            return hit
+        strict, soft, time_limit = request
+        with self._lock:
+            candidates = list(self._groups.get(strict, ()))
+        count = len(soft)
+        best, best_score = None, self.similarity
+        for cand_soft, cand_time, key in candidates:
+            # Jaccard can't exceed the smaller set's size over the larger one's
+            cand_count = len(cand_soft)
+            if cand_time > time_limit or min(count, cand_count) < best_score * max(count, cand_count):
+                continue
+            union = len(soft | cand_soft)
+            score = len(soft & cand_soft) / union if union else 1.0
+            if score >= best_score:
+                value = self._entries.get(key)
+                if value is not None:
+                    best, best_score = value, score
+        return best
+
+    def set(self, request: tuple, value: Any):
+        strict, soft, time_limit = request
+        key = self._key(request)
+        self._entries.set(key, value)
+        with self._lock:
+            group = [e for e in self._groups.get(strict, ()) if e[2] != key]
+            group.append((soft, time_limit, key))
+            self._groups[strict] = group[-self.max_per_group:]
+            # Drop candidates whose entry expired or was evicted, and groups left empty, so
+            # the index stays no larger than the entries it points to
+            for g in list(self._groups):
+                live = [e for e in self._groups[g] if e[2] in self._entries]
+                if live:
+                    self._groups[g] = live
+                else:
+                    del self._groups[g]
+
+    def pop(self, request: tuple):
+        self._entries.pop(self._key(request))
+
+def get_user(username: str) -> Dict[str, Any]:
+    """
+    Returns the stored profile for username, or a fresh one if the user is new.
+    """
+    return _user_store().get(username) or new_user()
+
+def save_user(username: str, user: Dict[str, Any]):
+    _user_store().put(username, user)
 
 # ---------- LLM Integration (Ollama) ----------
+@st.cache_resource
+def _response_cache() -> RecipeCache:
+    """
+    Process-wide cache of parsed LLM recipes, shared by all sessions.
+    Lets a repeated or near-identical "Get Recipes" skip both the model and the JSON parse.
+    """
+    return RecipeCache(max_entries=256, ttl=86400)
+
+def recipe_request(backend: str, model: str, temperature: float, pantry: Sequence[str], meal_type: str, time_limit: int,
+                   mood: Sequence[str], constraints: Sequence[str], must_use: Sequence[str]) -> tuple:
+    """
+    Canonicalizes generation inputs into a RecipeCache request: the hard requirements
+    that must match exactly, the pantry and mood features compared by overlap, and the
+    time limit.
+    """
+    strict = (backend, model, temperature, meal_type.lower(), tuple(sorted(constraints)), tuple(sorted({m.lower() for m in must_use})))
+    soft = frozenset(p.lower() for p in pantry) | frozenset(f"mood:{m.lower()}" for m in mood)
+    return strict, soft, int(time_limit)
+
+def _requests():
+    """
+    Imports requests on first use, so the landing page never loads requests/urllib3.
+    """
+    import requests
+    return requests
+
+@st.cache_resource
+def _http() -> requests.Session:
+    """
+    Process-wide HTTP session so Ollama and OpenRouter calls reuse pooled keep-alive connections.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = _requests().Session()
+    # Bodies are pre-serialized with json_dumps, so the content type is set once here
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_models(ollama_url_base: str) -> List[str]:
+    """
+    Returns the names of the models installed on the Ollama server.
+    Cached for a minute so repeated generations skip the /api/tags round-trip.
+    """
+    resp = _http().get(f"{ollama_url_base}/api/tags", timeout=5)
+    resp.raise_for_status()
+    return [m.get("name", "") for m in resp.json().get("models", [])]
+
+def _ollama_reachable(ollama_url_base: str) -> bool:
+    """
+    Fast TCP connect probe so a missing Ollama server fails in well under a second
+    instead of after the HTTP timeouts. The result is remembered for 30 seconds.
+    """
+    probes = st.session_state.setdefault("_ollama_up", {})
+    up, expires = probes.get(ollama_url_base, (False, 0))
+    if expires > time.time():
+        return up
+    parts = urlsplit(ollama_url_base)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parts.hostname, port), timeout=0.5):
+            up = True
+    except OSError:
+        up = False
+    probes[ollama_url_base] = (up, time.time() + 30)
+    return up
+
 def ensure_ollama_model(model: str, ollama_url_base: str = None, timeout: int = 180) -> bool:
     """
     Checks if the model is available, and pulls it if not.
     Returns True if model is available or successfully pulled, False otherwise.
     """
-    import time
     if ollama_url_base is None:
         ollama_url_base = os.getenv("OLLAMA_URL", "http://ollama:11434")
+    if not _ollama_reachable(ollama_url_base):
+        logger.warning("Ollama is not reachable at %s", ollama_url_base)
+        return False
     # Check model availability
     try:
-        resp = requests.get(f"{ollama_url_base}/api/tags", timeout=timeout)
-        if resp.status_code == 200:
-            tags = resp.json().get("models", [])
-            if any(m.get("name", "") == model for m in tags):
-                return True
+        if model in _list_models(ollama_url_base):
+            return True
     except Exception as e:
-        print("Error checking Ollama models:", e)
+        logger.warning("Error checking Ollama models: %s", e)
         return False
-    # Pull model if not available
+    # Pull model if not available; the pull endpoint streams progress and ends with "success"
     try:
-        print(f"Pulling Ollama model: {model}")
-        pull_resp = requests.post(f"{ollama_url_base}/api/pull", json={"name": model}, timeout=timeout)
-        if pull_resp.status_code == 200:
-            # Wait for model to finish pulling
-            for _ in range(30):
-                resp = requests.get(f"{ollama_url_base}/api/tags", timeout=timeout)
-                if resp.status_code == 200:
-                    tags = resp.json().get("models", [])
-                    if any(m.get("name", "") == model for m in tags):
-                        return True
-                time.sleep(10)
-        print(f"Failed to pull model {model}: {pull_resp.text}")
+        logger.info("Pulling Ollama model: %s", model)
+        with _http().post(f"{ollama_url_base}/api/pull", data=json_dumps({"name": model, "stream": True}), stream=True, timeout=timeout) as pull_resp:
+            pull_resp.raise_for_status()
+            for line in pull_resp.iter_lines():
+                if not line:
+                    continue
+                status = json_loads(line)
+                if status.get("error"):
+                    logger.warning("Failed to pull model %s: %s", model, status["error"])
+                    return False
+                if status.get("status") == "success":
+                    _list_models.clear()
+                    return True
+        logger.info("Pull stream for %s ended before success, polling for the model", model)
+    except _requests().RequestException as e:
+        # The server keeps pulling after the client drops, so a broken stream isn't a failure yet
+        logger.info("Pull stream for %s interrupted (%s), polling for the model", model, e)
     except Exception as e:
-        print("Error pulling Ollama model:", e)
-    return False
+        logger.warning("Error pulling Ollama model: %s", e)
+        return False
+    return _wait_for_model(model, ollama_url_base, timeout)
+
+def _wait_for_model(model: str, ollama_url_base: str, timeout: int) -> bool:
+    """
+    Polls /api/tags with exponential backoff (0.5s doubling up to 10s) until the model
+    shows up or the timeout runs out.
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        _list_models.clear()
+        try:
+            if model in _list_models(ollama_url_base):
+                return True
+        except _requests().RequestException as e:
+            logger.warning("Error checking Ollama models: %s", e)
+        delay = min(0.5 * 2 ** attempt, 10)
+        if time.monotonic() + delay > deadline:
+            logger.warning("Failed to pull model %s: not available after %ss", model, timeout)
+            return False
+        time.sleep(delay)
+        attempt += 1
+
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    """
+    Process-wide worker pool for issuing Ollama requests concurrently.
+    """
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="ollama")
+
+@st.cache_resource
+def _model_ok_until() -> Dict[tuple, float]:
+    """
+    Process-wide {(ollama_url_base, model): monotonic expiry} of recently verified models.
+    Shared by all sessions, so only the first generation in a five-minute window hits /api/tags.
+    """
+    return {}
+
+# Generations ask Ollama to keep the model for OLLAMA_KEEP_ALIVE, so a warm-up older than
+# that may have been unloaded since and is redone on the next rerun
+@st.cache_resource(show_spinner=False, ttl=OLLAMA_KEEP_ALIVE)
+def _warm_up(model: str, ollama_url_base: str) -> Future:
+    session = _http()  # resolved here: cached functions need the script thread's context
+
+    def preload() -> bool:
+        try:
+            session.post(f"{ollama_url_base}/api/generate", data=json_dumps({"model": model, "prompt": "", "keep_alive": -1}), timeout=300)
+            return True
+        except _requests().RequestException as e:
+            logger.warning("Ollama warm-up failed: %s", e)
+            return False
+
+    return _executor().submit(preload)
+
+def warm_ollama_model(model: str, ollama_url_base: str):
+    """
+    Loads the model into memory once per server, in the background, so the first
+    generation doesn't pay for the cold start. An empty prompt only loads the model.
+    A failed warm-up (e.g. Ollama still starting) is retried on the next rerun.
+    """
+    future = _warm_up(model, ollama_url_base)
+    if future.done() and not future.result():
+        _warm_up.clear()
+
+def _ollama_ready(model: str, ollama_url_base: str, timeout: int) -> bool:
+    """
+    Ensures the model is available, unless it was verified recently, and returns whether it is.
+    Raises ConnectionError right away when the server cannot be reached.
+    """
+    if not _ollama_reachable(ollama_url_base):
+        raise ConnectionError(f"Ollama is not reachable at {ollama_url_base}")
+    if _model_ok_until().get((ollama_url_base, model), 0) > time.monotonic():
+        return True
+    return ensure_ollama_model(model, ollama_url_base, timeout)
+
+def _mark_model_ok(ollama_url_base: str, model: str):
+    _model_ok_until()[(ollama_url_base, model)] = time.monotonic() + 300
+
+def _generate_chunks(session: requests.Session, url: str, payload: Dict[str, Any], timeout: int) -> Iterator[str]:
+    """
+    Yields response text chunks from a streaming /api/generate call.
+    Uses no Streamlit state, so it can run on the worker pool.
+    """
+    with session.post(url, data=json_dumps(payload), stream=True, timeout=timeout) as resp:
+        logger.debug("Ollama response status: %s", resp.status_code)
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = json_loads(line)
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                break
+
+def _forget_on_http_error(ollama_url_base: str, model: str, error: requests.HTTPError):
+    if error.response is not None and (error.response.status_code == 404 or error.response.status_code >= 500):
+        _model_ok_until().pop((ollama_url_base, model), None)
+
+class GenerationJob:
+    """
+    A batch of concurrent Ollama generations running on the worker pool.
+    Kept in session_state so later reruns can show progress and collect the results
+    without blocking the script thread. Sessions asking for the same recipes share one
+    job through InflightJobs, which cancels it once every subscriber has released it.
+    """
+
+    def __init__(self, ollama_url_base: str, model: str, n_prompts: int):
+        self.ollama_url_base = ollama_url_base
+        self.model = model
+        self.partials = [""] * n_prompts
+        self.futures: List[Future] = []
+        self.subscribers = 1
+        self.abandoned = False
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def finished(self) -> int:
+        return sum(f.done() for f in self.futures)
+
+    def cancel(self):
+        # Only requests still queued on the pool can be cancelled; running ones finish unread
+        self.abandoned = True
+        for f in self.futures:
+            f.cancel()
+
+    def results(self) -> List[Optional[str]]:
+        """
+        Returns the response texts in prompt order, with None for any request that failed.
+        Call from the script thread once done() is True.
+        """
+        results: List[Optional[str]] = []
+        for future in self.futures:
+            try:
+                results.append(future.result())
+            except _requests().HTTPError as e:
+                _forget_on_http_error(self.ollama_url_base, self.model, e)
+                logger.warning("Ollama generation failed: %s", e)
+                results.append(None)
+            except Exception as e:
+                logger.warning("Ollama generation failed: %s", e)
+                results.append(None)
+        if any(r is not None for r in results):
+            _mark_model_ok(self.ollama_url_base, self.model)
+        return results
+
+class InflightJobs:
+    """
+    Process-wide {recipe request: GenerationJob} of generations still running, so an
+    identical request from any session joins the running job instead of starting another.
+    Every session's script thread uses it, so the lock covers lookups, joins,
+    registrations and releases.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[tuple, GenerationJob] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: tuple) -> Optional[GenerationJob]:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            if job.done() or job.abandoned:
+                # A finished job's results were already handed out, and failed or non-JSON
+                # ones were never cached, so an identical request asks Ollama again
+                del self._jobs[key]
+                return None
+            job.subscribers += 1
+            return job
+
+    def register(self, key: tuple, job: GenerationJob):
+        with self._lock:
+            for k in [k for k, j in self._jobs.items() if j.done() or j.abandoned]:
+                del self._jobs[k]
+            self._jobs[key] = job
+
+    def release(self, job: GenerationJob):
+        with self._lock:
+            job.subscribers -= 1
+            if job.subscribers <= 0:
+                job.cancel()
 
+@st.cache_resource
+def _inflight_jobs() -> InflightJobs:
+    return InflightJobs()
 
-def ollama_generate(prompt: str, model: str = "gemma3:1b", temperature: float = 0.6, timeout: int = 180) -> Optional[str]:
+def start_ollama_generation(prompts: Sequence[str], model: str = OLLAMA_MODELS[0], temperature: float = 0.6, timeout: int = 180,
+                            seeds: Optional[Sequence[int]] = None, num_predict: Optional[int] = None,
+                            fallback_models: Sequence[str] = (), json_format: Optional[Any] = None) -> Optional[GenerationJob]:
+    """
+    Submits one streamed generation per prompt to the worker pool and returns right away.
+    Optional per-prompt seeds, the num_predict output cap and a json_format ("json" or a
+    JSON schema for constrained decoding) are passed through to Ollama.
+    If the model can't be pulled, the first available of fallback_models is used instead.
+    Returns None when the server is unreachable or none of the models are available.
+    """
     ollama_url_base = os.getenv("OLLAMA_URL", "http://ollama:11434")
-    # Ensure model is available
-    ensure_ollama_model(model, ollama_url_base, timeout)
-    url = f"{ollama_url_base}/api/generate"
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": temperature}
-    }
     try:
-        print("Calling Ollama...")
-        resp = requests.post(url, json=payload, timeout=timeout)
-        print("Ollama response status:", resp.status_code)
-        if resp.status_code == 200:
-            return resp.json().get("response", "").strip()
-        return None
-    except Exception as e:
-        print(e)
+        for candidate in (model, *fallback_models):
+            if _ollama_ready(candidate, ollama_url_base, timeout):
+                model = candidate
+                break
+            logger.warning("Ollama model %s is unavailable", candidate)
+        else:
+            return None
+    except ConnectionError as e:
+        logger.warning("%s", e)
         return None
+    url = f"{ollama_url_base}/api/generate"
+    session = _http()
+    job = GenerationJob(ollama_url_base, model, len(prompts))
+
+    def generate(i: int, prompt: str, seed: Optional[int]) -> str:
+        options: Dict[str, Any] = {"temperature": temperature, **OLLAMA_OPTIONS}
+        if seed is not None:
+            options["seed"] = seed
+        if num_predict is not None:
+            options["num_predict"] = num_predict
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": options
+        }
+        if json_format is not None:
+            payload["format"] = json_format
+        for chunk in _generate_chunks(session, url, payload, timeout):
+            job.partials[i] += chunk
+        return job.partials[i].strip()
+
+    seeds = list(seeds) if seeds is not None else [None] * len(prompts)
+    logger.debug("Calling Ollama with %d concurrent prompts...", len(prompts))
+    job.futures = [_executor().submit(generate, i, prompt, seed) for i, (prompt, seed) in enumerate(zip(prompts, seeds))]
+    return job
 
 def openrouter_generate(prompt: str, timeout: int = 180) -> Optional[str]:
     """
     Uses OpenRouter API to generate recipes, returns JSON string.
     """
-    import requests
-    import json
     api_key = st.secrets["api_keys"]["openrouter"]
     url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {
@@ -165,112 +679,170 @@ def openrouter_generate(prompt: str, timeout: int = 180) -> Optional[str]:
         ]
     }
     try:
-        resp = requests.post(url, headers=headers, data=json.dumps(data), timeout=timeout)
+        resp = _http().post(url, headers=headers, data=json_dumps(data), timeout=timeout)
         if resp.status_code == 200:
             content = resp.json()['choices'][0]['message']['content']
             return content
         else:
-            print("OpenRouter error:", resp.text)
+            logger.warning("OpenRouter error: %s", resp.text)
             return None
     except Exception as e:
-        print("OpenRouter exception:", e)
+        logger.warning("OpenRouter exception: %s", e)
         return None
 
-SYSTEM_INSTRUCTIONS = """You are AI assistant specialized in crafting meal recipes for the user that the user constraints. \
-You must produce strictly VALID JSON when asked for recipe lists. No commentary. \
-Each recipe should also be a valid JSON and must include: title, summary, total_time_minutes, ingredients (list of strings), \
-steps (list of short imperative steps), and tags (list of strings). \
-Assume, you only have the provided pantry ingredients which are available for your use. Respect constraints and time limits. \
-Given the following context, generate EXACTLY 4 distinct recipes as a JSON array. Do not add new lines and tab spacing when creating the JSON response.
+SYSTEM_INSTRUCTIONS = """You are a recipe assistant. Reply with valid JSON only: no commentary, no newlines or indentation.
+"""
+
+RECIPE_RULES = """Rules:
+1. Return a JSON array of recipe objects with keys "title" (string), "summary" (string), "total_time_minutes" (integer),
+"ingredients" (list of strings), "steps" (list of 5-10 short imperative strings), "tags" (list of strings).
+2. Cook from the pantry; use every must-use ingredient; nothing exotic.
+3. Respect the constraints; stay within the time limit.
+4. Keep recipes simple and titles short and unique.
 """
 
-def build_recipe_prompt(pantry: List[str], meal_type: str, time_limit: int, mood: List[str], constraints: List[str], must_use: List[str]) -> str:
-    pantry_text = ", ".join(sorted(set([p.strip() for p in pantry if p.strip()])))
-    mood_text = ", ".join(mood) if mood else "none"
-    cons_text = ", ".join(constraints) if constraints else "none"
-    must_text = ", ".join(must_use) if must_use else "none"
-    return f"""{SYSTEM_INSTRUCTIONS}
-Given the following context, generate EXACTLY 4 distinct recipes as a JSON array.
-Context:
+# Passed as Ollama's "format" so decoding is constrained to a recipe array
+RECIPE_ARRAY_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "summary": {"type": "string"},
+            "total_time_minutes": {"type": "integer"},
+            "ingredients": {"type": "array", "items": {"type": "string"}},
+            "steps": {"type": "array", "items": {"type": "string"}},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["title", "summary", "total_time_minutes", "ingredients", "steps", "tags"],
+    },
+}
+
+# Everything static goes first so all prompts share a byte-identical prefix that
+# Ollama can reuse from its KV cache; only the context tail below varies.
+PROMPT_PREFIX = f"{SYSTEM_INSTRUCTIONS}\n{RECIPE_RULES}"
+PROMPT_TEMPLATE = PROMPT_PREFIX + """
+Generate EXACTLY {n_recipes} distinct recipe(s) for:
 - Meal type: {meal_type}
 - Time limit (minutes): {time_limit}
-- Mood keywords: {mood_text}
-- Constraints: {cons_text}
-- Must-use ingredients: {must_text}
-- Pantry ingredients available: {pantry_text}
-
-Rules:
-- ONLY return valid JSON: an array of 4 recipe objects.
-- Each recipe object must have keys:
-  "title" (string),
-  "summary" (string),
-  "total_time_minutes" (integer <= {time_limit}),
-  "ingredients" (list of strings, relying on pantry where possible),
-  "steps" (list of 5-10 concise steps),
-  "tags" (list of strings).
-- Favor simple, quick recipes that respect the time limit.
-- Avoid exotic ingredients not in the pantry.
-- Keep titles unique and succinct.
+- Mood keywords: {mood}
+- Constraints: {constraints}
+- Must-use ingredients: {must_use}
+- Pantry ingredients available: {pantry}
 JSON:
 """
 
+def build_recipe_prompt(pantry: Sequence[str], meal_type: str, time_limit: int, mood: Sequence[str], constraints: Sequence[str], must_use: Sequence[str],
+                        n_recipes: int = RECIPE_COUNT) -> str:
+    return PROMPT_TEMPLATE.format(
+        n_recipes=n_recipes,
+        meal_type=meal_type,
+        time_limit=time_limit,
+        mood=", ".join(mood) or "none",
+        constraints=", ".join(constraints) or "none",
+        must_use=", ".join(must_use) or "none",
+        pantry=", ".join(pantry),  # already normalized when the pantry was saved
+    )
+
+_JSON_RE = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.S)
+
+def extract_json_array(response_text: str) -> str:
+    """
+    Returns the JSON array in a model response, with or without a ```json fence.
+    """
+    stripped = response_text.strip()
+    if stripped.startswith("[") and stripped.endswith("]"):
+        return stripped  # schema-constrained output needs no scan
+    m = _JSON_RE.search(response_text)
+    if m:
+        return m.group(1)
+    return response_text[response_text.find("["):response_text.rfind("]") + 1]
+
+def parse_recipes(response_text: str) -> List[Dict[str, Any]]:
+    """
+    Parses the recipe objects out of a model response, returning an empty list if none parse.
+    Output that is almost valid JSON (trailing commas, unquoted keys, a cut-off tail) is
+    salvaged with json_repair when it is installed.
+    """
+    text = extract_json_array(response_text) or response_text
+    try:
+        parsed = json_loads(text)
+    except json.JSONDecodeError:
+        if json_repair is None:
+            return []
+        parsed = json_repair.loads(text)
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    if not isinstance(parsed, list):
+        return []
+    return [r for r in parsed if isinstance(r, dict)]
+
 # ---------- Local fallback ----------
-DEFAULT_STEPS = [
+DEFAULT_STEPS = (
     "Prep all ingredients as needed.",
     "Heat a pan or pot and add oil if required.",
     "Cook main components until done.",
     "Season to taste and combine all elements.",
     "Plate and serve."
-]
-
-def naive_generate_recipes(pantry: List[str], meal_type: str, time_limit: int, mood: List[str], constraints: List[str], must_use: List[str]) -> List[Dict[str, Any]]:
-    base_names = {
-        "breakfast": ["Quick Skillet Hash", "Speedy Scramble Bowl", "Pantry Oat Parfait", "Toasty Sandwich Melt", "5-Min Omelet Wrap"],
-        "lunch": ["15-Min Pantry Pasta", "Zippy Grain Bowl", "Crisp Veggie Wrap", "One-Pan Fried Rice", "Hearty Bean Salad"],
-        "dinner": ["Weeknight Stir-Fry", "Simple Sheet-Pan Bake", "Creamy Pantry Pasta", "Speedy Chili", "Golden Veg Curry"],
-        "snacks": ["Savory Trail Mix", "Nutty Energy Bites", "Crisp Chickpea Snack", "Cheesy Toast Bites", "Yogurt Fruit Cup"]
-    }
-    key = meal_type.lower()
-    titles = base_names.get(key, base_names["dinner"])
-    recipes = []
-    for i, title in enumerate(titles):
-        recipes.append({
+)
+BASE_NAMES = {
+    "breakfast": ("Quick Skillet Hash", "Speedy Scramble Bowl", "Pantry Oat Parfait", "Toasty Sandwich Melt", "5-Min Omelet Wrap"),
+    "lunch": ("15-Min Pantry Pasta", "Zippy Grain Bowl", "Crisp Veggie Wrap", "One-Pan Fried Rice", "Hearty Bean Salad"),
+    "dinner": ("Weeknight Stir-Fry", "Simple Sheet-Pan Bake", "Creamy Pantry Pasta", "Speedy Chili", "Golden Veg Curry"),
+    "snacks": ("Savory Trail Mix", "Nutty Energy Bites", "Crisp Chickpea Snack", "Cheesy Toast Bites", "Yogurt Fruit Cup")
+}
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _naive_recipes(pantry: Sequence[str], meal_type: str, time_limit: int, mood: Sequence[str], constraints: Sequence[str], must_use: Sequence[str]) -> Tuple[Dict[str, Any], ...]:
+    """
+    Builds the fallback recipes once per distinct input and shares them process-wide.
+    Every field value is immutable, so callers only need shallow copies of the dicts.
+    """
+    titles = BASE_NAMES.get(meal_type.lower(), BASE_NAMES["dinner"])
+    # Every recipe shares the same immutable fields, so they're built once
+    summary = f"A quick {meal_type} using pantry staples."
+    total_time = min(time_limit, 20)
+    ingredients = tuple(pantry[:5]) if pantry else ("salt", "pepper", "oil")
+    tags = tuple(constraints[:3])
+    return tuple(
+        {
             "title": f"{title} #{i+1}",
-            "summary": f"A quick {meal_type} using pantry staples.",
-            "total_time_minutes": min(time_limit, 20),
-            "ingredients": pantry[:5] if pantry else ["salt", "pepper", "oil"],
+            "summary": summary,
+            "total_time_minutes": total_time,
+            "ingredients": ingredients,
             "steps": DEFAULT_STEPS,
-            "tags": constraints[:3]
-        })
-    return recipes
+            "tags": tags
+        }
+        for i, title in enumerate(titles)
+    )
+
+def naive_generate_recipes(pantry: Sequence[str], meal_type: str, time_limit: int, mood: Sequence[str], constraints: Sequence[str], must_use: Sequence[str]) -> List[Dict[str, Any]]:
+    return [dict(r) for r in _naive_recipes(tuple(pantry), meal_type, time_limit, tuple(mood), tuple(constraints), tuple(must_use))]
 
 # ---------- Onboarding Flow ----------
-if "onboarding_step" not in st.session_state:
-    st.session_state.onboarding_step = 0
-if "onboarding_user" not in st.session_state:
-    st.session_state.onboarding_user = ""
-if "onboarding_diet" not in st.session_state:
-    st.session_state.onboarding_diet = []
-if "onboarding_allergies" not in st.session_state:
-    st.session_state.onboarding_allergies = []
-if "onboarding_pantry" not in st.session_state:
-    st.session_state.onboarding_pantry = []
-if "session_user" not in st.session_state:
-    st.session_state.session_user = None
-
-logo_path = "eatsmart_logo.png"  # Place your logo in the same directory
+SESSION_DEFAULTS = {
+    "onboarding_step": 0,
+    "onboarding_user": "",
+    "onboarding_diet": [],
+    "onboarding_allergies": [],
+    "onboarding_pantry": [],
+    "session_user": None,
+}
+for key, value in SESSION_DEFAULTS.items():
+    # Copied so sessions never share the same default list
+    st.session_state.setdefault(key, copy.copy(value))
+
+# Served by Streamlit's static file serving (enableStaticServing in .streamlit/config.toml), so the
+# browser fetches and caches it once instead of receiving it inline on every rerun
+LOGO_URL = "app/static/eatsmart_logo.png"
 
 def onboarding():
     step = st.session_state.onboarding_step
     if step == 0:
         # Landing page
-        import base64
-        with open(logo_path, "rb") as f:
-            logo_bytes = f.read()
-        logo_base64 = base64.b64encode(logo_bytes).decode("utf-8")
         st.markdown(f"""
             <div style='display: flex; flex-direction: column; align-items: center; justify-content: center;'>
-                <img src='data:image/png;base64,{logo_base64}' alt='EatSmart Logo' style='height:108px; margin-bottom:1rem;'>
+                <img src='{LOGO_URL}' alt='EatSmart Logo' style='height:108px; margin-bottom:1rem;'>
                 <h1 style='color: #d35400; font-family: Georgia, Arial, serif; margin-bottom: 0.2rem; text-align: center;'>Welcome to EatSmart!</h1>
                 <h3 style='text-align:center; color:#d35400;'>Your AI-powered kitchen companion</h3>
                 <h5 style='text-align:center; font-style: italic; color:#d35400;'>Get personalized recipes based on your pantry and preferences.</h5>
@@ -278,14 +850,17 @@ def onboarding():
         """, unsafe_allow_html=True)
         st.markdown("<br><br>", unsafe_allow_html=True)
         st.markdown("""<span style='color:#d35400; font-size:1.1rem;'>Enter your name or ID to get started:</span>""", unsafe_allow_html=True)
-        name = st.text_input("", key="onboarding_name", label_visibility="collapsed")
-        def next1_callback():
-            if name.strip():
-                st.session_state.onboarding_user = name.strip()
-                st.session_state.onboarding_step = 1
-            else:
-                st.session_state.show_warning = True
-        st.button("Next", key="onboarding_next1", on_click=next1_callback)
+        # In a form, typing doesn't rerun the script; Next (or Enter) submits the name once
+        with st.form("name_form"):
+            st.text_input("", key="onboarding_name", label_visibility="collapsed")
+            def next1_callback():
+                name = st.session_state.onboarding_name.strip()
+                if name:
+                    st.session_state.onboarding_user = name
+                    st.session_state.onboarding_step = 1
+                else:
+                    st.session_state.show_warning = True
+            st.form_submit_button("Next", on_click=next1_callback)
         if st.session_state.get("show_warning"):
             st.warning("Please enter your name or ID.")
             st.session_state.show_warning = False
@@ -295,57 +870,282 @@ def onboarding():
         diet_val = st.session_state.get("onboarding_diet", [])
         allergies_list = st.session_state.get("onboarding_allergies", [])
         allergies_val = ", ".join(allergies_list) if allergies_list else ""
-        diet = st.multiselect(
-            "Dietary preferences:",
-            ["Vegetarian", "Non-Vegetarian", "Vegan"],
-            default=diet_val,
-            key="onboarding_diet_widget"
-        )
-        allergies = st.text_input(
-            "Allergies (comma-separated):",
-            value=allergies_val,
-            key="onboarding_allergies_widget"
-        )
-        def next2_callback():
-            st.session_state.onboarding_diet = diet
-            st.session_state.onboarding_allergies = [a.strip() for a in allergies.split(",") if a.strip()]
-            st.session_state.onboarding_step = 2
-        def back1_callback():
-            st.session_state.onboarding_step = 0
-        col_back, col_next, _ = st.columns([0.15, 0.15, 0.7])
-        with col_back:
-            st.button("Back", key="onboarding_back1", on_click=back1_callback)
-        with col_next:
-            st.button("Next", key="onboarding_next2", on_click=next2_callback)
+        # A form batches edits into one rerun; callbacks read the submitted widget values
+        with st.form("profile_form"):
+            st.multiselect(
+                "Dietary preferences:",
+                ["Vegetarian", "Non-Vegetarian", "Vegan"],
+                default=diet_val,
+                key="onboarding_diet_widget"
+            )
+            st.text_input(
+                "Allergies (comma-separated):",
+                value=allergies_val,
+                key="onboarding_allergies_widget"
+            )
+            def next2_callback():
+                allergies = st.session_state.onboarding_allergies_widget
+                st.session_state.onboarding_diet = st.session_state.onboarding_diet_widget
+                st.session_state.onboarding_allergies = [a.strip() for a in allergies.split(",") if a.strip()]
+                st.session_state.onboarding_step = 2
+            def back1_callback():
+                st.session_state.onboarding_step = 0
+            col_back, col_next, _ = st.columns([0.15, 0.15, 0.7])
+            with col_back:
+                st.form_submit_button("Back", on_click=back1_callback)
+            with col_next:
+                st.form_submit_button("Next", on_click=next2_callback)
     elif step == 2:
         st.markdown("<h2 style='color:#d35400;'>Enter your pantry items</h2>", unsafe_allow_html=True)
         pantry_val = st.session_state.get("onboarding_pantry", [])
         pantry_str = ", ".join(pantry_val) if isinstance(pantry_val, list) else (pantry_val or "")
-        pantry = st.text_area("List your pantry items (comma-separated):", value=pantry_str, key="onboarding_pantry_widget")
-        def finish_callback():
-            st.session_state.onboarding_pantry = [item.strip() for item in pantry.split(",") if item.strip()]
-            st.session_state.onboarding_complete = True
-            st.session_state.onboarding_step = 99  # Mark as done so main app loads
-        def back2_callback():
-            st.session_state.onboarding_step = 1
-        col_back, col_finish, _ = st.columns([0.15, 0.15, 0.7])
-        with col_back:
-            st.button("Back", key="onboarding_back2", on_click=back2_callback)
-        with col_finish:
-            st.button("Finish", key="onboarding_finish", on_click=finish_callback)
+        with st.form("pantry_form"):
+            st.text_area("List your pantry items (comma-separated):", value=pantry_str, key="onboarding_pantry_widget")
+            def finish_callback():
+                st.session_state.onboarding_pantry = normalize_pantry(st.session_state.onboarding_pantry_widget)
+                st.session_state.onboarding_complete = True
+                save_onboarding_profile()
+            def back2_callback():
+                st.session_state.onboarding_step = 1
+            col_back, col_finish, _ = st.columns([0.15, 0.15, 0.7])
+            with col_back:
+                st.form_submit_button("Back", on_click=back2_callback)
+            with col_finish:
+                st.form_submit_button("Finish", on_click=finish_callback)
     else:
         # Onboarding complete, save user and proceed to main app
-        users = load_users()
-        user_obj = get_user(users, st.session_state.onboarding_user)
-        user_obj["pantry"] = st.session_state.onboarding_pantry
-        user_obj["profile"]["diet"] = st.session_state.onboarding_diet
-        user_obj["profile"]["allergies"] = st.session_state.onboarding_allergies
-        users[st.session_state.onboarding_user] = user_obj
-        save_users(users)
-        st.session_state.session_user = st.session_state.onboarding_user
-        st.session_state.onboarding_step = 99  # Mark as done
+        save_onboarding_profile()
         st.success("Profile saved! Proceeding to your recipe dashboard...")
 
+def save_onboarding_profile():
+    user_obj = get_user(st.session_state.onboarding_user)
+    user_obj["pantry"] = st.session_state.onboarding_pantry
+    user_obj["profile"]["diet"] = st.session_state.onboarding_diet
+    user_obj["profile"]["allergies"] = st.session_state.onboarding_allergies
+    save_user(st.session_state.onboarding_user, user_obj)
+    st.session_state.session_user = st.session_state.onboarding_user
+    st.session_state.onboarding_step = 99  # Mark as done so main app loads
+
+# ---------- Recipe cards ----------
+# Shared by every recipe card, so the rules are sent once per render instead of once per card
+RECIPE_CARD_CSS = """
+<style>
+.flip-card-grid {
+    display: grid;
+    grid-template-columns: repeat(2, 1fr);
+}
+.flip-card {
+    background-color: transparent;
+    width: 260px;
+    height: 260px;
+    perspective: 1000px;
+    margin: 0 auto 1.2rem auto;
+    cursor: pointer;
+}
+.flip-card-inner {
+    position: relative;
+    width: 100%;
+    height: 100%;
+    text-align: center;
+    transition: transform 0.6s;
+    transform-style: preserve-3d;
+}
+.flip-card-front {
+    position: absolute;
+    width: 100%;
+    height: 100%;
+    backface-visibility: hidden;
+    border-radius: 16px;
+    box-shadow: 0 2px 8px #d3540033;
+    background: #fff7ed;
+    display: flex;
+    flex-direction: column;
+    justify-content: flex-start;
+    align-items: flex-start;
+    z-index: 2;
+    overflow-y: auto;
+    padding: 1rem;
+}
+.flip-card-front::-webkit-scrollbar {
+    width: 8px;
+}
+.flip-card-front::-webkit-scrollbar-thumb {
+    background: #d3540033;
+    border-radius: 8px;
+}
+.main-flip-card {
+    background-color: transparent;
+    width: 520px;
+    height: 520px;
+    perspective: 1000px;
+    margin: 0 auto 2rem auto;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+}
+.main-flip-card-inner {
+    width: 100%;
+    height: 100%;
+    border-radius: 16px;
+    box-shadow: 0 2px 16px #d3540033;
+    background: #fff7ed;
+    padding: 2rem;
+    display: flex;
+    flex-direction: column;
+    justify-content: flex-start;
+    align-items: flex-start;
+    overflow-y: auto;
+    max-height: 520px;
+}
+.mini-flip-card {
+    width: 180px;
+    height: 180px;
+    background: #fff7ed;
+    border-radius: 16px;
+    box-shadow: 0 2px 8px #d3540033;
+    display: flex;
+    flex-direction: column;
+    justify-content: flex-start;
+    align-items: flex-start;
+    cursor: pointer;
+    transition: box-shadow 0.2s;
+    overflow-y: auto;
+    padding: 1rem;
+}
+.mini-flip-card:hover {
+    box-shadow: 0 4px 16px #d3540066;
+}
+.main-flip-card-inner::-webkit-scrollbar, .mini-flip-card::-webkit-scrollbar {
+    width: 8px;
+}
+.main-flip-card-inner::-webkit-scrollbar-thumb, .mini-flip-card::-webkit-scrollbar-thumb {
+    background: #d3540033;
+    border-radius: 8px;
+}
+</style>
+"""
+
+def with_card_html(recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Formats each recipe's list fields into card HTML once, when the recipes are stored,
+    so the reruns that re-render the cards only look the strings up.
+    """
+    for r in recipes:
+        tags = r.get("tags") or ()
+        r["_tags_html"] = ", ".join(tags)
+        r["_short_tags_html"] = ", ".join(tags[:4])
+        r["_ingredients_html"] = "".join(f"<li>{ing}</li>" for ing in r.get("ingredients") or ())
+        r["_steps_html"] = "".join(f"<li>{step}</li>" for step in r.get("steps") or ())
+    return recipes
+
+def select_recipe(idx: int):
+    st.session_state.selected_recipe_idx = idx
+
+@st.fragment
+def render_recipes():
+    """
+    Renders the recommendation cards. As a fragment, clicking a card reruns only
+    this block instead of the whole app.
+    """
+    recipes = st.session_state.generated_recipes[:4] if len(st.session_state.generated_recipes) >= 4 else st.session_state.generated_recipes
+    st.markdown("<h2 style='color:#d35400;'>Recommendations</h2>", unsafe_allow_html=True)
+    if recipes and isinstance(recipes, list):
+        st.markdown(RECIPE_CARD_CSS, unsafe_allow_html=True)
+        num_recipes = len(recipes)
+        if "selected_recipe_idx" not in st.session_state:
+            st.session_state.selected_recipe_idx = None
+        selected = st.session_state.selected_recipe_idx
+        if selected is not None and selected < num_recipes:
+            # Enlarged, flipped main card (simulate flip with conditional rendering)
+            st.markdown(f"""
+            <div class="main-flip-card">
+              <div class="main-flip-card-inner" onclick="window.parent.postMessage({{isStreamlitMessage: true, type: 'streamlit:setComponentValue', value: null}}, '*');">
+                <h3 style='color:#d35400;'>{recipes[selected].get('title','')}</h3>
+                <b>Description:</b> {recipes[selected].get('summary','')}<br>
+                <b>Time Required:</b> {recipes[selected].get('total_time_minutes','?')} min<br>
+                <b>Tags:</b> {recipes[selected]['_tags_html']}<br>
+                <b>Ingredients:</b>
+                <ul style='text-align:left;'>
+                  {recipes[selected]['_ingredients_html']}
+                </ul>
+                <b>Steps:</b>
+                <ol style='text-align:left;'>
+                  {recipes[selected]['_steps_html']}
+                </ol>
+              </div>
+            </div>
+            """, unsafe_allow_html=True)
+            # Mini cards row (other cards) using columns for horizontal layout
+            mini_cards = [i for i in range(num_recipes) if i != selected]
+            if mini_cards:
+                mini_cols = st.columns(len(mini_cards), gap="large")
+                for col, idx in zip(mini_cols, mini_cards):
+                    recipe = recipes[idx]
+                    with col:
+                        st.button(" ", key=f"mini_card_{idx}", on_click=select_recipe, args=(idx,))
+                        st.markdown(f"""
+                        <div class="mini-flip-card">
+                            <h5 style='color:#d35400; margin-bottom:0.5rem;'>{recipe.get('title','')}</h5>
+                            <p style='font-size:0.95rem; margin-bottom:0.3rem;'>{recipe.get('summary','')}</p>
+                            <span style='font-size:0.9rem; color:#d35400;'>⏱ {recipe.get('total_time_minutes','?')} min</span><br>
+                            <span style='font-size:0.9rem; color:#d35400;'>Tags: {recipe['_short_tags_html']}</span>
+                        </div>
+                        """, unsafe_allow_html=True)
+        else:
+            # Show grid of cards (default view): one row of selection buttons, then every
+            # card in a single markdown element
+            for idx, col in enumerate(st.columns(num_recipes)):
+                col.button(recipes[idx].get("title") or f"Recipe {idx + 1}", key=f"card_{idx}", on_click=select_recipe, args=(idx,))
+            cards = "".join(
+                f"""<div class="flip-card"><div class="flip-card-inner"><div class="flip-card-front">
+<h4 style='color:#d35400; margin-bottom:0.5rem;'>{recipe.get('title','')}</h4>
+<p style='font-size:1.05rem; margin-bottom:0.3rem;'>{recipe.get('summary','')}</p>
+<span style='font-size:0.95rem; color:#d35400;'>⏱ {recipe.get('total_time_minutes','?')} min</span><br>
+<span style='font-size:0.95rem; color:#d35400;'>Tags: {recipe['_short_tags_html']}</span>
+</div></div></div>"""
+                for recipe in recipes
+            )
+            st.markdown(f'<div class="flip-card-grid">{cards}</div>', unsafe_allow_html=True)
+
+@st.fragment(run_every=0.5)
+def poll_generation():
+    """
+    Shows the streamed tokens of the pending Ollama job. Once every request has finished,
+    stores the parsed recipes and reruns the app to show them.
+    """
+    pending = st.session_state.get("pending_generation")
+    if pending is None:
+        return
+    job = pending["job"]
+    if not job.done():
+        finished = job.finished()
+        st.progress(finished / RECIPE_COUNT, text=f"{finished}/{RECIPE_COUNT} recipes ready")
+        for col, text in zip(st.columns(len(job.partials)), job.partials):
+            if text:
+                col.code(text[-400:], language="json")
+        return
+    del st.session_state.pending_generation
+    responses = [r for r in job.results() if r]
+    if responses:
+        # Each response holds a one-recipe JSON array; keep whichever ones parse
+        recipes = []
+        for response_text in responses:
+            recipes.extend(parse_recipes(response_text))
+        if recipes:
+            # A partial set would be served to every matching request for a day
+            if len(recipes) == RECIPE_COUNT:
+                _response_cache().set(pending["cache_key"], tuple(dict(r) for r in recipes))
+        else:
+            # Handle non-JSON output
+            st.toast("Model returned non-JSON output. Displaying raw response.")
+            recipes = [{"recipe": responses[0]}]  # Wrap raw text in a list for display
+    else:
+        # Ollama not available -> fallback
+        logger.info("Ollama not available or failed. Using naive generator.")
+        recipes = naive_generate_recipes(*pending["fallback"])
+    st.session_state.generated_recipes = with_card_html(recipes)
+    st.rerun()
+
 if st.session_state.get("onboarding_step", 0) < 3:
     onboarding()
     st.stop()
@@ -356,28 +1156,24 @@ if st.session_state.get("onboarding_step", 0) >= 3:
     DISABLE_OLLAMA = True  # Set to True to use OpenRouter, False to use Ollama
 
     # Load user object for the current session
-    users = load_users()
-    user_obj = get_user(users, st.session_state.session_user)
-    # Set default model name for Ollama
-    model_name = "gemma3:1b"
-    import base64
-
-    with open(logo_path, "rb") as f:
-        logo_bytes = f.read()
-    logo_base64 = base64.b64encode(logo_bytes).decode("utf-8")
+    user_obj = get_user(st.session_state.session_user)
+    # Set default model name and sampling temperature for Ollama
+    model_name = OLLAMA_MODELS[0]
+    temperature = 0.6
+    if not DISABLE_OLLAMA:
+        warm_ollama_model(model_name, os.getenv("OLLAMA_URL", "http://ollama:11434"))
 
     st.markdown(f"""
         <div style='display: flex; align-items: center;'>
-            <img src='data:image/png;base64,{logo_base64}' alt='EatSmart Logo' style='height:48px; margin-right:16px;'>
+            <img src='{LOGO_URL}' alt='EatSmart Logo' style='height:48px; margin-right:16px;'>
             <h2 style='color:#d35400; font-family:Georgia, Arial, serif; margin:0;'>What are you hungry for today?</h2>
         </div>
     """, unsafe_allow_html=True)
 
     with st.form("main_app_form"):
-        meal_options = ["Choose an option", "Breakfast", "Lunch", "Dinner", "Snack"]
         meal_type = st.selectbox(
             "Select a meal:",
-            meal_options,
+            MEAL_OPTIONS,
             index=0,
             key="main_meal_type"
         )
@@ -385,248 +1181,112 @@ if st.session_state.get("onboarding_step", 0) >= 3:
             "How much time do you have? (minutes)",
             min_value=5, max_value=120, value=30, step=1, key="main_time_limit"
         )
-        mood_options = ["Comforting", "Spicy", "Creamy", "Light", "Tangy", "Savory", "Sweet", "Fresh", "Hearty", "Zesty"]
         mood = st.multiselect(
             "What are you in the mood for? (optional)",
-            mood_options,
+            MOOD_OPTIONS,
             key="main_mood"
         )
-        constraint_options = ["High-protein", "Low-calorie", "Vegan", "Vegetarian", "Gluten-free", "Dairy-free", "Nut-free", "Low-carb"]
         constraints = st.multiselect(
             "Any constraints? (optional)",
-            constraint_options,
+            CONSTRAINT_OPTIONS,
             key="main_constraints"
         )
         include_ingredients = st.text_input(
             "Any ingredients you want included? (optional)",
             key="main_include_ingredients"
         )
-        col1, col2 = st.columns([1,1])
+        col1, col2, col3 = st.columns([1,1,1])
         with col1:
             back_clicked = st.form_submit_button("Back to Edit Profile", use_container_width=True)
         with col2:
             submitted = st.form_submit_button("Get Recipes", use_container_width=True)
+        with col3:
+            regenerate = st.form_submit_button("Regenerate", help="Ask the model again instead of reusing cached recipes", use_container_width=True)
         if back_clicked:
             st.session_state.onboarding_step = 2
             st.stop()
 
-    if submitted:
+    if submitted or regenerate:
         # Process the form data and generate recipes
         meal_type = st.session_state.main_meal_type.lower()
         time_limit = st.session_state.main_time_limit
-        mood = st.session_state.main_mood
-        constraints = st.session_state.main_constraints
-        must_use = [m.strip() for m in st.session_state.main_include_ingredients.split(",") if m.strip()]
+        # Tuples keep the cached fallback builder cheap to hash
+        mood = tuple(st.session_state.main_mood)
+        constraints = tuple(st.session_state.main_constraints)
+        must_use = tuple(m.strip() for m in st.session_state.main_include_ingredients.split(",") if m.strip())
+        pantry = tuple(user_obj.get("pantry", []))
+        # A new request supersedes any generation still running for this session; it is
+        # released only after the new job is picked, in case both are the same job
+        superseded = st.session_state.pop("pending_generation", None)
 
         with st.spinner("Generating recipes..."):
-            import re
-            def robust_json_parse(response_text):
-                try:
-                    return json.loads(response_text)
-                except json.JSONDecodeError:
-                    match = re.search(r'\[.*\]', response_text, re.DOTALL)
-                    if match:
-                        try:
-                            return json.loads(match.group(0))
-                        except Exception:
-                            pass
-                    return None
-
-            prompt = build_recipe_prompt(user_obj.get("pantry", []), meal_type, time_limit, mood, constraints, must_use)
+            prompt = build_recipe_prompt(pantry, meal_type, time_limit, mood, constraints, must_use)
+            # Only the Ollama path needs the one-recipe prompt
+            single_prompt = None if DISABLE_OLLAMA else build_recipe_prompt(pantry, meal_type, time_limit, mood, constraints, must_use, n_recipes=1)
+            cache = _response_cache()
             if DISABLE_OLLAMA:
+                cache_key = recipe_request("openrouter", "", 0.0, pantry, meal_type, time_limit, mood, constraints, must_use)
+            else:
+                cache_key = recipe_request("ollama", model_name, temperature, pantry, meal_type, time_limit, mood, constraints, must_use)
+            if regenerate:
+                cache.pop(cache_key)
+            # A regenerate asks for fresh recipes, so it skips the near-match tier too
+            cached_recipes = cache.get(cache_key, near=not regenerate)
+            if cached_recipes is not None:
+                recipes = [dict(r) for r in cached_recipes]
+            elif DISABLE_OLLAMA:
                 response_text = openrouter_generate(prompt)
                 if response_text:
-                    recipes = robust_json_parse(response_text)
-                    if recipes and isinstance(recipes, list) and len(recipes) == 4:
-                        pass
+                    recipes = parse_recipes(response_text)
+                    if recipes:
+                        if len(recipes) == RECIPE_COUNT:
+                            cache.set(cache_key, tuple(dict(r) for r in recipes))
                     else:
-                        print("Error parsing OpenRouter JSON")
+                        logger.warning("Error parsing OpenRouter JSON")
                         st.warning("OpenRouter returned non-JSON output. Displaying raw response.")
                         recipes = [{"recipe": response_text}]
                 else:
-                    print("OpenRouter not available or failed. Using naive generator.")
-                    recipes = naive_generate_recipes(user_obj.get("pantry", []), meal_type, time_limit, mood, constraints, must_use)
+                    logger.info("OpenRouter not available or failed. Using naive generator.")
+                    recipes = naive_generate_recipes(pantry, meal_type, time_limit, mood, constraints, must_use)
             else:
-                response_text = ollama_generate(prompt, model=model_name) if model_name else None
-                if response_text:
-                    # Try to parse the JSON
-                    response_text = response_text[8:-4]
-                    print("Ollama response text:", response_text)  # Debug: Log the raw response
-                    try:
-                        recipes = json.loads(response_text)
-                        if not isinstance(recipes, list) or len(recipes) != 4:
-                            raise ValueError("Expected a list of 4 recipes.")
-                    except json.JSONDecodeError:
-                        # Handle non-JSON output
-                        st.warning("Model returned non-JSON output. Displaying raw response.")
-                        recipes = [{"recipe": response_text}]  # Wrap raw text in a list for display
-                    except Exception as e:
-                        print("Error parsing JSON:", e)  # Debug: Log the error
-                        st.warning("Unexpected error occurred. Falling back to local generator.")
-                        recipes = naive_generate_recipes(user_obj.get("pantry", []), meal_type, time_limit, mood, constraints, must_use)
+                # One single-recipe generation per card, run concurrently with distinct seeds on the
+                # worker pool; poll_generation picks up the results on later reruns. An identical
+                # request that is already running (from any session) is joined instead.
+                inflight = _inflight_jobs()
+                job = None if regenerate else inflight.join(cache_key)
+                if job is None and model_name:
+                    job = start_ollama_generation(
+                        [single_prompt] * RECIPE_COUNT,
+                        model=model_name,
+                        temperature=temperature,
+                        seeds=range(RECIPE_COUNT),
+                        num_predict=RECIPE_MAX_TOKENS,
+                        fallback_models=OLLAMA_MODELS[1:],
+                        json_format=RECIPE_ARRAY_SCHEMA
+                    )
+                    if job is not None:
+                        if job.model != model_name:
+                            # Recipes from a fallback model must not be cached or joined as the primary's
+                            cache_key = recipe_request("ollama", job.model, temperature, pantry, meal_type, time_limit, mood, constraints, must_use)
+                        inflight.register(cache_key, job)
+                if job is not None:
+                    st.session_state.pending_generation = {
+                        "job": job,
+                        "cache_key": cache_key,
+                        "fallback": (pantry, meal_type, time_limit, mood, constraints, must_use),
+                    }
+                    recipes = None
                 else:
                     # Ollama not available -> fallback
-                    print("Ollama not available or failed. Using naive generator.")
-                    recipes = naive_generate_recipes(user_obj.get("pantry", []), meal_type, time_limit, mood, constraints, must_use)
+                    logger.info("Ollama not available or failed. Using naive generator.")
+                    recipes = naive_generate_recipes(pantry, meal_type, time_limit, mood, constraints, must_use)
 
-            st.session_state.generated_recipes = recipes
+            if recipes is not None:
+                st.session_state.generated_recipes = with_card_html(recipes)
+        if superseded:
+            _inflight_jobs().release(superseded["job"])
 
+    if "pending_generation" in st.session_state:
+        poll_generation()
     if "generated_recipes" in st.session_state:
-        recipes = st.session_state.generated_recipes[:4] if len(st.session_state.generated_recipes) >= 4 else st.session_state.generated_recipes
-        st.markdown("<h2 style='color:#d35400;'>Recommendations</h2>", unsafe_allow_html=True)
-        if recipes and isinstance(recipes, list):
-            num_recipes = len(recipes)
-            if "selected_recipe_idx" not in st.session_state:
-                st.session_state.selected_recipe_idx = None
-            selected = st.session_state.selected_recipe_idx
-            if selected is not None and selected < num_recipes:
-                # Enlarged, flipped main card (simulate flip with conditional rendering)
-                st.markdown(f"""
-                <style>
-                .main-flip-card {{
-                    background-color: transparent;
-                    width: 520px;
-                    height: 520px;
-                    perspective: 1000px;
-                    margin: 0 auto 2rem auto;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }}
-                .main-flip-card-inner {{
-                    width: 100%;
-                    height: 100%;
-                    border-radius: 16px;
-                    box-shadow: 0 2px 16px #d3540033;
-                    background: #fff7ed;
-                    padding: 2rem;
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: flex-start;
-                    align-items: flex-start;
-                    overflow-y: auto;
-                    max-height: 520px;
-                }}
-                .mini-flip-card {{
-                    width: 180px;
-                    height: 180px;
-                    background: #fff7ed;
-                    border-radius: 16px;
-                    box-shadow: 0 2px 8px #d3540033;
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: flex-start;
-                    align-items: flex-start;
-                    cursor: pointer;
-                    transition: box-shadow 0.2s;
-                    overflow-y: auto;
-                    padding: 1rem;
-                }}
-                .mini-flip-card:hover {{
-                    box-shadow: 0 4px 16px #d3540066;
-                }}
-                .main-flip-card-inner::-webkit-scrollbar, .mini-flip-card::-webkit-scrollbar {{
-                    width: 8px;
-                }}
-                .main-flip-card-inner::-webkit-scrollbar-thumb, .mini-flip-card::-webkit-scrollbar-thumb {{
-                    background: #d3540033;
-                    border-radius: 8px;
-                }}
-                </style>
-                <div class="main-flip-card">
-                  <div class="main-flip-card-inner" onclick="window.parent.postMessage({{isStreamlitMessage: true, type: 'streamlit:setComponentValue', value: null}}, '*');">
-                    <h3 style='color:#d35400;'>{recipes[selected].get('title','')}</h3>
-                    <b>Description:</b> {recipes[selected].get('summary','')}<br>
-                    <b>Time Required:</b> {recipes[selected].get('total_time_minutes','?')} min<br>
-                    <b>Tags:</b> {', '.join(recipes[selected].get('tags',[]))}<br>
-                    <b>Ingredients:</b>
-                    <ul style='text-align:left;'>
-                      {''.join([f'<li>{ing}</li>' for ing in recipes[selected].get('ingredients',[])])}
-                    </ul>
-                    <b>Steps:</b>
-                    <ol style='text-align:left;'>
-                      {''.join([f'<li>{step}</li>' for step in recipes[selected].get('steps',[])])}
-                    </ol>
-                  </div>
-                </div>
-                """, unsafe_allow_html=True)
-                # Mini cards row (other cards) using columns for horizontal layout
-                mini_cards = [i for i in range(num_recipes) if i != selected]
-                if mini_cards:
-                    mini_cols = st.columns(len(mini_cards), gap="large")
-                    for col, idx in zip(mini_cols, mini_cards):
-                        recipe = recipes[idx]
-                        with col:
-                            if st.button(" ", key=f"mini_card_{idx}"):
-                                st.session_state.selected_recipe_idx = idx
-                            st.markdown(f"""
-                            <div class="mini-flip-card">
-                                <h5 style='color:#d35400; margin-bottom:0.5rem;'>{recipe.get('title','')}</h5>
-                                <p style='font-size:0.95rem; margin-bottom:0.3rem;'>{recipe.get('summary','')}</p>
-                                <span style='font-size:0.9rem; color:#d35400;'>⏱ {recipe.get('total_time_minutes','?')} min</span><br>
-                                <span style='font-size:0.9rem; color:#d35400;'>Tags: {', '.join(recipe.get('tags',[])[:4])}</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-            else:
-                # Show grid of cards (default view)
-                grid_rows = (num_recipes + 1) // 2
-                grid = [st.columns(2) for _ in range(grid_rows)]
-                for idx in range(num_recipes):
-                    row, col = divmod(idx, 2)
-                    recipe = recipes[idx]
-                    with grid[row][col]:
-                        if st.button(" ", key=f"card_{idx}"):
-                            st.session_state.selected_recipe_idx = idx
-                        st.markdown(f"""
-                        <style>
-                        .flip-card-{idx} {{
-                            background-color: transparent;
-                            width: 260px;
-                            height: 260px;
-                            perspective: 1000px;
-                            margin: 0 auto 1.2rem auto;
-                            cursor: pointer;
-                        }}
-                        .flip-card-inner-{idx} {{
-                            position: relative;
-                            width: 100%;
-                            height: 100%;
-                            text-align: center;
-                            transition: transform 0.6s;
-                            transform-style: preserve-3d;
-                        }}
-                        .flip-card-front-{idx} {{
-                            position: absolute;
-                            width: 100%;
-                            height: 100%;
-                            backface-visibility: hidden;
-                            border-radius: 16px;
-                            box-shadow: 0 2px 8px #d3540033;
-                            background: #fff7ed;
-                            display: flex;
-                            flex-direction: column;
-                            justify-content: flex-start;
-                            align-items: flex-start;
-                            z-index: 2;
-                            overflow-y: auto;
-                            padding: 1rem;
-                        }}
-                        .flip-card-front-{idx}::-webkit-scrollbar {{
-                            width: 8px;
-                        }}
-                        .flip-card-front-{idx}::-webkit-scrollbar-thumb {{
-                            background: #d3540033;
-                            border-radius: 8px;
-                        }}
-                        </style>
-                        <div class="flip-card-{idx}">
-                          <div class="flip-card-inner-{idx}">
-                            <div class="flip-card-front-{idx}">
-                              <h4 style='color:#d35400; margin-bottom:0.5rem;'>{recipe.get('title','')}</h4>
-                              <p style='font-size:1.05rem; margin-bottom:0.3rem;'>{recipe.get('summary','')}</p>
-                              <span style='font-size:0.95rem; color:#d35400;'>⏱ {recipe.get('total_time_minutes','?')} min</span><br>
-                              <span style='font-size:0.95rem; color:#d35400;'>Tags: {', '.join(recipe.get('tags',[])[:4])}</span>
-                            </div>
-                          </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+        render_recipes()